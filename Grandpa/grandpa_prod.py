@@ -271,10 +271,11 @@ class GrandpaRuntimeConfig:
             self.keys_all = json.load(f)
         with open(self.config_path) as f:
             self.config = json.load(f)
+        # Looked up on every finalize call, so built once per reload
+        self.validators_map = {v["id"]: v for v in self.keys_all["validators"]}
 
     def get_keys(self, node_id):
-        validators_map = {v["id"]: v for v in self.keys_all["validators"]}
-        return validators_map.get(node_id)
+        return self.validators_map.get(node_id)
 
     def get_config(self):
         return self.config
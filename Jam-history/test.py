@@ -141,6 +141,19 @@ def state_to_dict(state: State) -> Dict[str, Any]:
     return {'beta': beta_list}
 
 
+def transition_state(current_state: State, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the history STF for one block and return the post_state as a dict."""
+    input_obj = create_input_from_dict(input_data)
+    stf = HistorySTF()
+    transition_result = stf.transition(current_state, input_obj)
+    
+    # Extract post_state from the transition result
+    if not isinstance(transition_result, dict) or 'postState' not in transition_result:
+        raise ValueError("Invalid transition result format. Expected dict with 'postState' key")
+    
+    return state_to_dict(transition_result['postState'])
+
+
 def green(msg: str) -> None:
     
     print(f'\033[32m✓ {msg}\033[0m')
@@ -188,6 +201,8 @@ def main():
     
     # Try to get payload from curl command
     payload = parse_curl_payload()
+    # With --no-save the caller merges the printed post_state itself
+    save_server_state = '--no-save' not in sys.argv[1:]
     
     # Path to the updated_state.json file
     updated_state_path = (script_dir / ".." / "server" / "updated_state.json").resolve()
@@ -264,23 +279,9 @@ def main():
         }
         print("ℹ️  Latest beta block: " + json.dumps(latest_info, indent=2))
     
-    # Create input object for state transition
+    # Perform state transition
     try:
-        input_obj = create_input_from_dict(input_data)
-        # print(f"✅ Created input object: {input_obj}")
-        
-        # Perform state transition
-        stf = HistorySTF()
-        transition_result = stf.transition(current_state, input_obj)
-        
-        # Extract post_state from the transition result
-        if not isinstance(transition_result, dict) or 'postState' not in transition_result:
-            raise ValueError("Invalid transition result format. Expected dict with 'postState' key")
-            
-        post_state = transition_result['postState']
-        
-        # Convert post_state to dict for JSON serialization
-        post_state_dict = state_to_dict(post_state)
+        post_state_dict = transition_state(current_state, input_data)
         
         # Save the post_state to the server's updated_state.json
         server_state_path = script_dir.parent / 'server' / 'updated_state.json'
@@ -296,8 +297,9 @@ def main():
         server_state['beta'] = post_state_dict['beta']
         
         # Save the updated state back to server's updated_state.json
-        with open(server_state_path, 'w') as f:
-            json.dump(server_state, f, indent=2)
+        if save_server_state:
+            with open(server_state_path, 'w') as f:
+                json.dump(server_state, f, indent=2)
         
         # print(f"✅ State transition successful. Updated state saved to {server_state_path}")
         
@@ -14,12 +14,26 @@ from pathlib import Path
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-def process_input_file(input_path):
+def process_input_file(input_path, save=True):
     """Process the input file and update the state with its contents."""
     try:
         with open(input_path, 'r') as f:
             input_data = json.load(f)
-        
+    except Exception as e:
+        error_msg = f"Failed to process input file: {str(e)}\n{traceback.format_exc()}"
+        print(json.dumps({"error": error_msg}, indent=2))
+        return None
+    return process_input_data(input_data, save=save)
+
+def process_input_data(input_data, save=True):
+    """
+    Update the state with the preimages from an already parsed input.
+
+    Returns the prepared state, or None if the input could not be used.
+    With save=False the state is only returned and updated_state.json is
+    left untouched.
+    """
+    try:
         # Get the path to the state file
         state_file = os.path.join(
             os.path.dirname(__file__), 
@@ -72,17 +86,18 @@ def process_input_file(input_path):
                 state_data['post_state'] = {"accounts": []}
             
             # Save the updated state
-            os.makedirs(os.path.dirname(updated_state_path), exist_ok=True)
-            with open(updated_state_path, 'w') as f:
-                json.dump(state_data, f, indent=2)
+            if save:
+                os.makedirs(os.path.dirname(updated_state_path), exist_ok=True)
+                with open(updated_state_path, 'w') as f:
+                    json.dump(state_data, f, indent=2)
             
-            return True
+            return state_data
             
-        return False
+        return None
     except Exception as e:
-        error_msg = f"Failed to process input file: {str(e)}\n{traceback.format_exc()}"
+        error_msg = f"Failed to process input data: {str(e)}\n{traceback.format_exc()}"
         print(json.dumps({"error": error_msg}, indent=2))
-        return False
+        return None
 
 def main():
     """Main entry point for the jam-preimages component."""
@@ -90,7 +105,10 @@ def main():
         # Set up argument parsing
         parser = argparse.ArgumentParser(description='Process preimages and update state.')
         parser.add_argument('--input', type=str, help='Path to input JSON file')
+        parser.add_argument('--stdin', action='store_true', help='Read the input JSON from stdin')
         parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+        parser.add_argument('--no-save', action='store_true',
+                            help='Only print the post_state; do not write updated_state.json')
         args = parser.parse_args()
         
         # Set up logging
@@ -106,7 +124,16 @@ def main():
         logger = logging.getLogger(__name__)
         
         # Process input file if provided
-        if args.input:
+        state_data = None
+        if args.stdin:
+            logger.info("Processing input from stdin")
+            state_data = process_input_data(json.loads(sys.stdin.buffer.read()), save=not args.no_save)
+            if state_data is None:
+                error_msg = "Failed to process input from stdin"
+                logger.error(error_msg)
+                print(json.dumps({"error": error_msg}, indent=2))
+                sys.exit(1)
+        elif args.input:
             if not os.path.exists(args.input):
                 error_msg = f"Input file not found: {args.input}"
                 logger.error(error_msg)
@@ -114,7 +141,8 @@ def main():
                 sys.exit(1)
                 
             logger.info(f"Processing input file: {args.input}")
-            if not process_input_file(args.input):
+            state_data = process_input_file(args.input, save=not args.no_save)
+            if state_data is None:
                 error_msg = f"Failed to process input file: {args.input}"
                 logger.error(error_msg)
                 print(json.dumps({"error": error_msg}, indent=2))
@@ -124,7 +152,10 @@ def main():
         logger.info("Starting preimage processing")
         try:
             from process_updated_state import main as process_updated_state
-            process_updated_state()
+            process_updated_state(
+                state_data=state_data if args.no_save else None,
+                save=not args.no_save
+            )
             logger.info("Preimage processing completed successfully")
         except Exception as e:
             error_msg = f"Error in process_updated_state: {str(e)}\n{traceback.format_exc()}"
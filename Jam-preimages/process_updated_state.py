@@ -362,15 +362,15 @@ def run_preimage_test(test_vector: PreimagesTestVector) -> Tuple[bool, Optional[
 
 from src.state_manager import process_preimages
 
-def main() -> None:
+def main(state_data: Optional[Dict[str, Any]] = None, save: bool = True) -> None:
     """
     Main function to process updated_state.json.
     
     This function:
-    1. Loads the state from updated_state.json
+    1. Loads the state from updated_state.json (unless state_data is given)
     2. Processes any input preimages
     3. Generates the post_state
-    4. Saves the results to both updated_state.json and latest_result.json
+    4. Saves the results to both updated_state.json (unless save is False) and latest_result.json
     """
     try:
         logger.info("Starting process_updated_state.main()")
@@ -388,7 +388,9 @@ def main() -> None:
         }
         
         # Check if the file exists
-        if not os.path.exists(updated_state_path):
+        if state_data is not None:
+            logger.info("Using state provided by the caller")
+        elif not os.path.exists(updated_state_path):
             logger.warning(f"State file not found at {updated_state_path}, using default state")
             state_data = default_state
             # Create the directory structure if it doesn't exist
@@ -508,8 +510,9 @@ def main() -> None:
             merged_state['statistics'] = post_state['statistics']
         
         # Save the merged state back to updated_state.json
-        with open(updated_state_path, 'w') as f:
-            json.dump(merged_state, f, indent=2)
+        if save:
+            with open(updated_state_path, 'w') as f:
+                json.dump(merged_state, f, indent=2)
         
         # Save to latest_result.json
         results_dir = os.path.join(BASE_DIR, "results")
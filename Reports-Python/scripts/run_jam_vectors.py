@@ -234,6 +234,58 @@ def inspect_vector(vector_path):
     except Exception as e:
         print(f"Error inspecting file: {e}")
 
+def compute_post_state(pre_state, input_data):
+    """
+    Apply the guarantees in input_data to pre_state.
+
+    Returns the resulting post_state, or None when there is nothing to
+    process or processing fails.
+    """
+    if not pre_state:
+        print("❌ No pre_state found")
+        return None
+        
+    if not input_data:
+        print("❌ No input_data found")
+        return None
+        
+    if "guarantees" not in input_data or not input_data["guarantees"]:
+        print("❌ No guarantees found in input_data, skipping processing.")
+        return None
+
+    print("DEBUG: Loaded pre_state and input")
+    state = initialize_state(pre_state)
+    print("DEBUG: Initialized state")
+
+    slot = 0
+    try:
+        print("DEBUG: Attempting to extract lookup_slot from input_data")
+        guarantees = input_data.get('guarantees', [])
+        if guarantees and guarantees[0] and guarantees[0].get('report'):
+            report = guarantees[0]['report']
+            if isinstance(report, dict):
+                context = report.get('context', {}) if isinstance(report, dict) else {}
+                lookup_slot = context.get('lookup_anchor_slot')
+                if lookup_slot is not None:
+                    slot = int(lookup_slot) + 65
+                    print(f"DEBUG: Set slot to {slot} based on lookup_anchor_slot {lookup_slot}")
+    except Exception as e:
+        print(f"DEBUG: Exception in slot lookup: {e}")
+        import traceback
+        traceback.print_exc()
+
+    try:
+        extrinsic = map_input_to_extrinsic(input_data)
+        print("DEBUG: Mapped input to extrinsic")
+        process_guarantee_extrinsic(extrinsic, state, slot)
+        print("DEBUG: Processed guarantee extrinsic")
+    except Exception as e:
+        print(f"❌ Exception during processing: {e}")
+        return None
+
+    # Prepare post_state
+    return state.to_plain_object()
+
 def main():
     import argparse
     
@@ -242,6 +294,9 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Run JAM Reports component')
     parser.add_argument('--input', type=str, help='JSON input data for processing')
+    parser.add_argument('--stdin', action='store_true', help='Read the JSON input data from stdin')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Print post_state between POST_STATE markers instead of writing updated_state.json')
     args = parser.parse_args()
     
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -261,8 +316,15 @@ def main():
 
     pre_state = updated_state.get("pre_state")
     
-    # Use command line input if provided, otherwise fall back to file input
-    if args.input:
+    # Use stdin or command line input if provided, otherwise fall back to file input
+    if args.stdin:
+        try:
+            input_data = json.loads(sys.stdin.buffer.read())
+            print("DEBUG: Using stdin input data")
+        except json.JSONDecodeError as e:
+            print(f"❌ Invalid JSON on stdin: {e}")
+            return
+    elif args.input:
         try:
             input_data = json.loads(args.input)
             print("DEBUG: Using command line input data")
@@ -280,52 +342,17 @@ def main():
     print("DEBUG: pre_state:", json.dumps(pre_state, indent=2) if pre_state else "None")
     print("DEBUG: input_data:", json.dumps(input_data, indent=2) if input_data else "None")
 
-    if not pre_state:
-        print("❌ No pre_state found")
-        return
-        
-    if not input_data:
-        print("❌ No input_data found")
-        return
-        
-    if "guarantees" not in input_data or not input_data["guarantees"]:
-        print("❌ No guarantees found in input_data, skipping processing.")
+    post_state = compute_post_state(pre_state, input_data)
+    if post_state is None:
         return
+    print("DEBUG: post_state to write:", json.dumps(post_state, indent=2))
 
-    print("DEBUG: Loaded pre_state and input from updated_state.json")
-    state = initialize_state(pre_state)
-    print("DEBUG: Initialized state")
-
-    slot = 0
-    try:
-        print("DEBUG: Attempting to extract lookup_slot from input_data")
-        guarantees = input_data.get('guarantees', [])
-        if guarantees and guarantees[0] and guarantees[0].get('report'):
-            report = guarantees[0]['report']
-            if isinstance(report, dict):
-                context = report.get('context', {}) if isinstance(report, dict) else {}
-                lookup_slot = context.get('lookup_anchor_slot')
-                if lookup_slot is not None:
-                    slot = int(lookup_slot) + 65
-                    print(f"DEBUG: Set slot to {slot} based on lookup_anchor_slot {lookup_slot}")
-    except Exception as e:
-        print(f"DEBUG: Exception in slot lookup: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        extrinsic = map_input_to_extrinsic(input_data)
-        print("DEBUG: Mapped input to extrinsic")
-        process_guarantee_extrinsic(extrinsic, state, slot)
-        print("DEBUG: Processed guarantee extrinsic")
-    except Exception as e:
-        print(f"❌ Exception during processing: {e}")
+    if args.no_save:
+        print("\n=== POST_STATE ===")
+        print(json.dumps(post_state, indent=2))
+        print("=== END POST_STATE ===\n")
         return
 
-    # Prepare post_state
-    post_state = state.to_plain_object()
-    print("DEBUG: post_state to write:", json.dumps(post_state, indent=2))
-
     # Write post_state back to updated_state.json
     with open(updated_state_path, 'r+') as f:
         try:
@@ -8,6 +8,7 @@ pip install pynacl
 
 import json
 import base64
+from functools import lru_cache
 from nacl.signing import SigningKey, VerifyKey
 from nacl.exceptions import BadSignatureError
 
@@ -15,6 +16,16 @@ def encode_text(text: str) -> bytes:
     """Helper to encode text as UTF-8 bytes."""
     return text.encode('utf-8')
 
+@lru_cache(maxsize=64)
+def _signing_key(private_key_bytes: bytes) -> SigningKey:
+    """Cached SigningKey; construction derives the public key from the seed."""
+    return SigningKey(private_key_bytes)
+
+@lru_cache(maxsize=4096)
+def _verify_key(public_key_bytes: bytes) -> VerifyKey:
+    """Cached VerifyKey, so repeated guarantors skip re-parsing their key."""
+    return VerifyKey(public_key_bytes)
+
 def sign_message(message_object: dict, private_key_bytes: bytes) -> str:
     """
     Signs a message using a private key.
@@ -25,7 +36,7 @@ def sign_message(message_object: dict, private_key_bytes: bytes) -> str:
     try:
         message_string = json.dumps(message_object, separators=(',', ':'), sort_keys=True)
         message_bytes = encode_text(message_string)
-        signing_key = SigningKey(private_key_bytes)
+        signing_key = _signing_key(private_key_bytes)
         signature = signing_key.sign(message_bytes).signature
         return base64.b64encode(signature).decode('utf-8')
     except Exception as error:
@@ -44,7 +55,7 @@ def verify_signature(message_object: dict, signature_base64: str, public_key_byt
         message_string = json.dumps(message_object, separators=(',', ':'), sort_keys=True)
         message_bytes = encode_text(message_string)
         signature_bytes = base64.b64decode(signature_base64)
-        verify_key = VerifyKey(public_key_bytes)
+        verify_key = _verify_key(public_key_bytes)
         verify_key.verify(message_bytes, signature_bytes)
         return True
     except BadSignatureError:
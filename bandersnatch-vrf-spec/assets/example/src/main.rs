@@ -268,6 +268,16 @@ struct GammaZResponse {
     gamma_z: String,
 }
 
+#[derive(Deserialize)]
+struct GammaZBatchRequest {
+    batches: Vec<GammaZRequest>,
+}
+
+#[derive(Serialize)]
+struct GammaZBatchResponse {
+    gamma_z: Vec<String>,
+}
+
 #[derive(Deserialize)]
 struct CreateProverRequest {
     public_keys: Vec<String>,
@@ -315,6 +325,19 @@ struct IetfVrfSignResponse {
     signature: String,
 }
 
+#[derive(Deserialize)]
+struct SafrolePairRequest {
+    prover_id: String,
+    vrf_input_data: String,
+    aux_data: String,
+}
+
+#[derive(Serialize)]
+struct SafrolePairResponse {
+    hs: String,
+    hv: String,
+}
+
 #[derive(Deserialize)]
 struct CreateVerifierRequest {
     public_keys: Vec<String>,
@@ -419,6 +442,15 @@ async fn compose_gamma_z_handler(Json(req): Json<GammaZRequest>) -> Json<GammaZR
     })
 }
 
+async fn compose_gamma_z_batch_handler(Json(req): Json<GammaZBatchRequest>) -> Json<GammaZBatchResponse> {
+    let gamma_z = req
+        .batches
+        .iter()
+        .map(|ring| format!("0x{}", hex::encode(compose_gamma_z(&ring.public_keys))))
+        .collect();
+    Json(GammaZBatchResponse { gamma_z })
+}
+
 async fn create_prover_handler(
     axum::extract::State((prover_storage, _)): axum::extract::State<(ProverStorage, VerifierStorage)>,
     Json(req): Json<CreateProverRequest>,
@@ -507,6 +539,33 @@ async fn ietf_vrf_sign_handler(
     }))
 }
 
+/// Safrole seal (HS) and entropy VRF output (HV) in one call.
+///
+/// HS is the IETF VRF signature over the header; HV is the VRF output for
+/// "jam_entropy" || HS[..32], as computed by clients from two separate calls.
+async fn safrole_pair_handler(
+    axum::extract::State((prover_storage, _)): axum::extract::State<(ProverStorage, VerifierStorage)>,
+    Json(req): Json<SafrolePairRequest>,
+) -> Result<Json<SafrolePairResponse>, StatusCode> {
+    let vrf_input_data = hex::decode(req.vrf_input_data.trim_start_matches("0x"))
+        .map_err(|_| StatusCode::BAD_REQUEST)?;
+    let aux_data = hex::decode(req.aux_data.trim_start_matches("0x"))
+        .map_err(|_| StatusCode::BAD_REQUEST)?;
+
+    let storage = prover_storage.lock().unwrap();
+    let prover = storage.get(&req.prover_id).ok_or(StatusCode::NOT_FOUND)?;
+
+    let signature = prover.ietf_vrf_sign(&vrf_input_data, &aux_data);
+    let mut entropy_input = b"jam_entropy".to_vec();
+    entropy_input.extend_from_slice(&signature[..32]);
+    let output_hash = prover.vrf_output(&entropy_input);
+
+    Ok(Json(SafrolePairResponse {
+        hs: format!("0x{}", hex::encode(signature)),
+        hv: format!("0x{}", hex::encode(output_hash)),
+    }))
+}
+
 async fn create_verifier_handler(
     axum::extract::State((_, verifier_storage)): axum::extract::State<(ProverStorage, VerifierStorage)>,
     Json(req): Json<CreateVerifierRequest>,
@@ -736,6 +795,11 @@ async fn api_docs_handler() -> Json<ApiDocResponse> {
             path: "/compose_gamma_z".to_string(),
             description: "Compose gamma_z (ring commitment) from public keys".to_string(),
         },
+        ApiEndpoint {
+            method: "POST".to_string(),
+            path: "/compose_gamma_z_batch".to_string(),
+            description: "Compose gamma_z for several rings of public keys in one request".to_string(),
+        },
         ApiEndpoint {
             method: "POST".to_string(),
             path: "/prover/create".to_string(),
@@ -756,6 +820,11 @@ async fn api_docs_handler() -> Json<ApiDocResponse> {
             path: "/prover/ietf_vrf_sign".to_string(),
             description: "Create non-anonymous VRF signature (IETF standard)".to_string(),
         },
+        ApiEndpoint {
+            method: "POST".to_string(),
+            path: "/prover/safrole_pair".to_string(),
+            description: "Create the Safrole seal signature (HS) and entropy VRF output (HV) together".to_string(),
+        },
         ApiEndpoint {
             method: "POST".to_string(),
             path: "/verifier/create".to_string(),
@@ -793,10 +862,12 @@ async fn main() {
         .route("/", get(api_docs_handler))
         .route("/constant_points", get(constant_points_handler))
         .route("/compose_gamma_z", post(compose_gamma_z_handler))
+        .route("/compose_gamma_z_batch", post(compose_gamma_z_batch_handler))
         .route("/prover/create", post(create_prover_handler))
         .route("/prover/vrf_output", post(vrf_output_handler))
         .route("/prover/ring_vrf_sign", post(ring_vrf_sign_handler))
         .route("/prover/ietf_vrf_sign", post(ietf_vrf_sign_handler))
+        .route("/prover/safrole_pair", post(safrole_pair_handler))
         .route("/verifier/create", post(create_verifier_handler))
         .route("/verifier/ring_vrf_verify", post(ring_vrf_verify_handler))
         .route("/verifier/ring_vrf_verify_payload", post(ring_vrf_verify_payload_handler))
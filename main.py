@@ -72,6 +72,11 @@ def main():
     parser.add_argument(
         "--fail-fast", action="store_true", help="Stop on first failure."
     )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run vectors one at a time in this process (easier to debug).",
+    )
     args = parser.parse_args()
 
     if args.full:
@@ -83,7 +88,9 @@ def main():
         is_full = False
         print("Running TINY test vectors...")
 
-    success = run_all_tests(test_files, is_full=is_full, fail_fast=args.fail_fast)
+    success = run_all_tests(
+        test_files, is_full=is_full, fail_fast=args.fail_fast, sequential=args.sequential
+    )
     
     sys.exit(0 if success else 1)
 
@@ -15,10 +15,20 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timezone
 from copy import deepcopy
 from hashlib import sha256
+from functools import lru_cache
 import nacl.signing
 import nacl.encoding
 import secrets
 
+@lru_cache(maxsize=64)
+def _signing_key(private_key: bytes) -> nacl.signing.SigningKey:
+    """Build (and cache) a signing key; construction derives the public key."""
+    return nacl.signing.SigningKey(private_key)
+
+def canonical_payload(payload: dict) -> bytes:
+    """The signed and PVM-encoded form of a payload: sorted-key JSON as UTF-8."""
+    return json.dumps(payload, sort_keys=True).encode('utf-8')
+
 # Simple SCALE encoding for PVM communication
 def encode_u32(value: int) -> bytes:
     """Encode u32 as little-endian bytes."""
@@ -82,6 +92,19 @@ class AuthorizationProcessor:
         self.server_dir = server_dir or os.path.dirname(__file__)
         self.state_file = os.path.join(self.server_dir, "updated_state.json")
         self.pvm_url = pvm_url
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared client, so PVM calls reuse keep-alive connections."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+        return self._http_client
+
+    async def aclose(self):
+        """Close the shared PVM client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
         
     def load_state(self) -> Dict[str, Any]:
         """Load current state from updated_state.json."""
@@ -189,7 +212,7 @@ class AuthorizationProcessor:
             if public_key and signature:
                 try:
                     pvm_authorized, pvm_response = await self._verify_with_pvm(
-                        public_key, signature, payload, slot
+                        public_key, signature, payload, slot, pre_state
                     )
                 except Exception as pvm_error:
                     print(f"PVM verification failed: {pvm_error}")
@@ -226,20 +249,23 @@ class AuthorizationProcessor:
         public_key: str, 
         signature: str, 
         payload: dict, 
-        slot: int
+        slot: int,
+        state: Optional[Dict[str, Any]] = None
     ) -> tuple[bool, dict]:
         """
         Verify authorization with PVM using proper SCALE encoding.
+
+        state is the already loaded pre_state, if the caller has one.
         """
         try:
             # Get nonce for this public key
-            state = self.load_state()
+            if state is None:
+                state = self.load_state()
             current_auth = state.get("authorizations", {}).get(public_key, {})
             nonce = current_auth.get("nonce", 0)
             
             # Prepare payload data - hash the payload like PVM expects
-            payload_json = json.dumps(payload, sort_keys=True)
-            payload_data = payload_json.encode('utf-8')
+            payload_data = canonical_payload(payload)
             
             # Convert hex strings to bytes
             public_key_bytes = bytes.fromhex(public_key)
@@ -258,14 +284,13 @@ class AuthorizationProcessor:
                 "core_index_hex": "00000000"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.pvm_url}/authorizer/is_authorized",
-                    json=pvm_request,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                pvm_result = response.json()
+            response = await self._get_http_client().post(
+                f"{self.pvm_url}/authorizer/is_authorized",
+                json=pvm_request,
+                timeout=10.0
+            )
+            response.raise_for_status()
+            pvm_result = response.json()
             
             # Check if authorization was successful
             # PVM returns the auth credentials hex if successful
@@ -401,7 +426,7 @@ class AuthorizationProcessor:
             seed_bytes = bytes.fromhex(seed) if len(seed) == 64 else seed.encode()[:32]
             if len(seed_bytes) < 32:
                 seed_bytes = seed_bytes + b'\x00' * (32 - len(seed_bytes))
-            private_key = nacl.signing.SigningKey(seed_bytes)
+            private_key = _signing_key(seed_bytes)
         else:
             # Generate random keypair
             private_key = nacl.signing.SigningKey.generate()
@@ -410,13 +435,14 @@ class AuthorizationProcessor:
         
         return public_key.encode().hex(), private_key.encode().hex()
     
+    def sign_payload_bytes(self, payload: dict, private_key: bytes) -> bytes:
+        """Sign payload with a raw 32-byte Ed25519 private key, returning the raw signature."""
+        payload_hash = sha256(canonical_payload(payload)).digest()
+        return _signing_key(private_key).sign(payload_hash).signature
+
     def sign_payload(self, payload: dict, private_key_hex: str) -> str:
         """Sign payload with Ed25519 private key."""
-        private_key = nacl.signing.SigningKey(bytes.fromhex(private_key_hex))
-        payload_json = json.dumps(payload, sort_keys=True)
-        payload_hash = sha256(payload_json.encode()).digest()
-        signature = private_key.sign(payload_hash)
-        return signature.signature.hex()
+        return self.sign_payload_bytes(payload, bytes.fromhex(private_key_hex)).hex()
 
 # Main processor instance
 authorization_processor = AuthorizationProcessor()
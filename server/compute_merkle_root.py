@@ -9,8 +9,14 @@ Usage: python compute_merkle_root.py <path_to_state.json>
 import hashlib
 import json
 import sys
+import orjson
 from typing import Dict, List, Tuple, Optional
 
+# Shared all-zero 32-byte hash; many state fields (anchors, roots, gamma_z)
+# are zero-filled, so return this instead of allocating a fresh value.
+_ZERO32 = bytes(32)
+_ZERO32_HEX = ('0x' + '00' * 32, '00' * 32)
+
 # ==============================================================================
 # MERKLE TRIE COMPONENT
 # ==============================================================================
@@ -47,7 +53,7 @@ def get_bit(key_bytes: bytes, index: int) -> bool:
 def merkle(kvs: List[Tuple[bytes, bytes]], i: int = 0) -> bytes:
     """Recursively computes the Merkle root for a list of key-value pairs."""
     if not kvs:
-        return b'\0' * 32
+        return _ZERO32
     
     if len(kvs) == 1:
         k, v = kvs[0]
@@ -102,6 +108,8 @@ def safe_hex_to_bytes(hex_str):
     """Safely convert a hex string to bytes, handling various formats."""
     if not hex_str:
         return b''
+    if hex_str in _ZERO32_HEX:
+        return _ZERO32
     # Remove '0x' prefix if present
     if hex_str.startswith('0x'):
         hex_str = hex_str[2:]
@@ -114,109 +122,174 @@ def safe_hex_to_bytes(hex_str):
         print(f"Warning: Invalid hex string '{hex_str}': {e}")
         return b''
 
+def serialize_validator(validator_data: dict) -> bytes:
+    """Concatenates a single validator's keys and metadata."""
+    return b''.join((
+        safe_hex_to_bytes(validator_data.get('bandersnatch', '')),
+        safe_hex_to_bytes(validator_data.get('ed25519', '')),
+        safe_hex_to_bytes(validator_data.get('bls', '')),
+        safe_hex_to_bytes(validator_data.get('metadata', '')),
+    ))
+
+# The serializers below collect parts and join them once; repeated
+# bytes += would copy the growing value on every append.
+
+def serialize_validators(validators: list) -> bytes:
+    return b''.join(serialize_validator(v) for v in validators)
+
+def serialize_beta(beta: list) -> bytes:
+    parts = []
+    for item in beta:
+        mmr = item.get('mmr', {})
+        parts.append(safe_hex_to_bytes(item.get('header_hash', '')))
+        parts.append(mmr.get('count', 0).to_bytes(8, 'little'))
+        parts.extend(safe_hex_to_bytes(peak) for peak in mmr.get('peaks', []))
+        for report in item.get('reported', []):
+            parts.append(safe_hex_to_bytes(report.get('exports_root', '')))
+            parts.append(safe_hex_to_bytes(report.get('hash', '')))
+        parts.append(safe_hex_to_bytes(item.get('state_root', '')))
+    return b''.join(parts)
+
+def serialize_service_registry(service_registry: dict) -> bytes:
+    parts = []
+    for path, data in service_registry.items():
+        parts.append(path.encode('utf-8'))
+        parts.append(safe_hex_to_bytes(data.get('codeHash', '')))
+    return b''.join(parts)
+
+def serialize_psi(psi: dict) -> bytes:
+    return b''.join(
+        safe_hex_to_bytes(item)
+        for list_name in ['bad', 'good', 'offenders', 'wonky']
+        for item in psi.get(list_name, [])
+    )
+
+def serialize_eta(eta: list) -> bytes:
+    # Dictionary items are not part of the serialized value
+    return b''.join(safe_hex_to_bytes(item) for item in eta if isinstance(item, str))
+
+# (name, chapter, selector, serializer) for every top-level state component
+STATE_CHAPTERS = (
+    ('gamma_k', 100, lambda state: state.get('gamma_k'), serialize_validators),
+    ('kappa', 101, lambda state: state.get('kappa'), serialize_validators),
+    ('lambda_', 102, lambda state: state.get('lambda_'), serialize_validators),
+    ('gamma_z', 103, lambda state: state.get('gamma_z'), safe_hex_to_bytes),
+    ('beta', 104, lambda state: state.get('beta'), serialize_beta),
+    ('globalState', 105, lambda state: state.get('globalState', {}).get('serviceRegistry'), serialize_service_registry),
+    ('psi', 106, lambda state: state.get('psi'), serialize_psi),
+    ('eta', 107, lambda state: state.get('eta'), serialize_eta),
+)
+
 def serialize_state(state_data: dict) -> Dict[bytes, bytes]:
     """
     Takes a JSON state object and serializes it into a key-value dictionary
     ready for the merkle() function, based on the actual state structure.
     """
     serialized_map = {}
-    
-    def process_validator(validator_data):
-        """Helper to process a single validator's data."""
-        value = b''
-        value += safe_hex_to_bytes(validator_data.get('bandersnatch', ''))
-        value += safe_hex_to_bytes(validator_data.get('ed25519', ''))
-        value += safe_hex_to_bytes(validator_data.get('bls', ''))
-        value += safe_hex_to_bytes(validator_data.get('metadata', ''))
-        return value
-    
-    # --- Serialize Gamma K (Chapter 100) ---
-    if state_data.get('gamma_k'):
-        key = state_key_constructor(100)
-        value = b''.join(process_validator(v) for v in state_data['gamma_k'])
+    for name, chapter, select, serialize in STATE_CHAPTERS:
+        component = select(state_data)
+        if not component:
+            continue
+        value = serialize(component)
         if value:
+            key = state_key_constructor(chapter)
             serialized_map[key] = value
-            print(f"Added gamma_k with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Kappa (Chapter 101) ---
-    if state_data.get('kappa'):
-        key = state_key_constructor(101)
-        value = b''.join(process_validator(v) for v in state_data['kappa'])
-        if value:
-            serialized_map[key] = value
-            print(f"Added kappa with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Lambda (Chapter 102) ---
-    if state_data.get('lambda_'):
-        key = state_key_constructor(102)
-        value = b''.join(process_validator(v) for v in state_data['lambda_'])
-        if value:
-            serialized_map[key] = value
-            print(f"Added lambda_ with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Gamma Z (Chapter 103) ---
-    if state_data.get('gamma_z'):
-        key = state_key_constructor(103)
-        value = safe_hex_to_bytes(state_data['gamma_z'])
-        if value:
-            serialized_map[key] = value
-            print(f"Added gamma_z with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Beta (Chapter 104) ---
-    if state_data.get('beta'):
-        key = state_key_constructor(104)
-        value = b''
-        for item in state_data['beta']:
-            value += safe_hex_to_bytes(item.get('header_hash', ''))
-            value += item.get('mmr', {}).get('count', 0).to_bytes(8, 'little')
-            for peak in item.get('mmr', {}).get('peaks', []):
-                value += safe_hex_to_bytes(peak)
-            for report in item.get('reported', []):
-                value += safe_hex_to_bytes(report.get('exports_root', ''))
-                value += safe_hex_to_bytes(report.get('hash', ''))
-            value += safe_hex_to_bytes(item.get('state_root', ''))
-        if value:
-            serialized_map[key] = value
-            print(f"Added beta with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Global State (Chapter 105) ---
-    if state_data.get('globalState', {}).get('serviceRegistry'):
-        key = state_key_constructor(105)
-        value = b''
-        for path, data in state_data['globalState']['serviceRegistry'].items():
-            value += path.encode('utf-8')
-            value += safe_hex_to_bytes(data.get('codeHash', ''))
-        if value:
-            serialized_map[key] = value
-            print(f"Added globalState with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Psi (Chapter 106) ---
-    if state_data.get('psi'):
-        key = state_key_constructor(106)
-        value = b''
-        for list_name in ['bad', 'good', 'offenders', 'wonky']:
-            for item in state_data['psi'].get(list_name, []):
-                value += safe_hex_to_bytes(item)
-        if value:
-            serialized_map[key] = value
-            print(f"Added psi with key: 0x{key.hex()}, value length: {len(value)} bytes")
-    
-    # --- Serialize Eta (Chapter 107) ---
-    if state_data.get('eta'):
-        key = state_key_constructor(107)
-        value = b''
-        for item in state_data['eta']:
-            if isinstance(item, str):
-                value += safe_hex_to_bytes(item)
-            elif isinstance(item, dict):
-                # Handle dictionary items if needed
-                pass
-        if value:
-            serialized_map[key] = value
-            print(f"Added eta with key: 0x{key.hex()}, value length: {len(value)} bytes")
+            print(f"Added {name} with key: 0x{key.hex()}, value length: {len(value)} bytes")
     
     return serialized_map
 
+class CachedMerkleComputer:
+    """
+    Computes state roots across blocks, re-serializing only the chapters
+    whose content changed since the previous call.
+
+    Each chapter is fingerprinted by hashing its JSON encoding; validator
+    sets and history usually stay identical between blocks, so their
+    hex decoding is skipped. Leaf and branch hashes are memoized too, so a
+    changed chapter only rehashes the branches on its path to the root.
+    """
+    # Branch hashes kept between calls; a state has at most a handful of
+    # chapters, so this only bounds growth from long-running servers.
+    MAX_CACHED_NODES = 4096
+    # Above this fraction of changed leaves the memoized branches are
+    # mostly stale, so the tree is rebuilt from an empty memo instead.
+    FULL_REBUILD_RATIO = 0.25
+
+    def __init__(self):
+        # chapter -> (fingerprint, serialized value, leaf hash)
+        self._chapters: Dict[int, Tuple[bytes, bytes, Optional[bytes]]] = {}
+        # (bit depth, leaf hashes under the branch) -> branch hash
+        self._nodes: Dict[Tuple[int, Tuple[bytes, ...]], bytes] = {}
+        # Sorted (key, leaf hash) pairs and root of the previous call
+        self._leaves: List[Tuple[bytes, bytes]] = []
+        self.root: Optional[str] = None
+
+    def _chapter(self, name: str, chapter: int, component, serialize) -> Tuple[bytes, Optional[bytes]]:
+        """Returns the chapter's serialized value and leaf hash, reusing them if unchanged."""
+        fingerprint = hash_func(orjson.dumps(component))
+        cached = self._chapters.get(chapter)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1], cached[2]
+        value = serialize(component) if component else b''
+        leaf_hash = hash_func(leaf_node(state_key_constructor(chapter), value)) if value else None
+        self._chapters[chapter] = (fingerprint, value, leaf_hash)
+        if value:
+            print(f"Updated {name} chapter, value length: {len(value)} bytes")
+        return value, leaf_hash
+
+    def serialize_state(self, state_data: dict) -> Dict[bytes, bytes]:
+        """Same result as serialize_state(), reusing unchanged chapter values."""
+        serialized_map = {}
+        for name, chapter, select, serialize in STATE_CHAPTERS:
+            value, _ = self._chapter(name, chapter, select(state_data), serialize)
+            if value:
+                serialized_map[state_key_constructor(chapter)] = value
+        return serialized_map
+
+    def _merkle(self, leaves: List[Tuple[bytes, bytes]], i: int = 0) -> bytes:
+        """merkle() over sorted (key, leaf hash) pairs, reusing unchanged branches."""
+        if not leaves:
+            return _ZERO32
+        if len(leaves) == 1:
+            return leaves[0][1]
+        node_key = (i, tuple(leaf_hash for _, leaf_hash in leaves))
+        node = self._nodes.get(node_key)
+        if node is None:
+            left = [leaf for leaf in leaves if not get_bit(leaf[0], i)]
+            right = [leaf for leaf in leaves if get_bit(leaf[0], i)]
+            node = hash_func(branch_node(self._merkle(left, i + 1), self._merkle(right, i + 1)))
+            self._nodes[node_key] = node
+        return node
+
+    def compute(self, state_data: dict) -> str:
+        """Cached counterpart of compute_merkle_root_from_data()."""
+        try:
+            leaves = []
+            for name, chapter, select, serialize in STATE_CHAPTERS:
+                _, leaf_hash = self._chapter(name, chapter, select(state_data), serialize)
+                if leaf_hash is not None:
+                    leaves.append((state_key_constructor(chapter), leaf_hash))
+            if not leaves:
+                return "0x" + ("00" * 32)
+            leaves.sort(key=lambda x: x[0])
+            if leaves == self._leaves and self.root is not None:
+                return self.root
+
+            changed = len(set(leaves).difference(self._leaves))
+            if (changed > self.FULL_REBUILD_RATIO * len(leaves)
+                    or len(self._nodes) > self.MAX_CACHED_NODES):
+                self._nodes.clear()
+            self._leaves = leaves
+            self.root = "0x" + self._merkle(leaves).hex()
+            return self.root
+        except Exception as e:
+            print(f"Error computing merkle root from data: {e}")
+            self._chapters.clear()
+            self._nodes.clear()
+            self._leaves = []
+            self.root = None
+            return "0x" + ("00" * 32)
+
 def debug_print_state_structure(state_data, indent=0):
     """Recursively print the structure of the state data for debugging."""
     if isinstance(state_data, dict):
@@ -157,7 +157,7 @@ class SafroleServerIntegration:
             
             if block:
                 # Validate the block
-                is_valid = self.producer.validate_block(block)
+                is_valid = self.producer.validate_own_block(block)
                 
                 return {
                     "success": True,
@@ -2,7 +2,7 @@ import json
 import base64
 import requests
 from nacl.signing import SigningKey
-from nacl.encoding import Base64Encoder, HexEncoder
+from nacl.encoding import Base64Encoder
 
 def test_authorization():
     # Generate a new keypair
@@ -23,7 +23,7 @@ def test_authorization():
     
     # Prepare the request
     request_data = {
-        "public_key": verify_key.encode(encoder=HexEncoder).decode('utf-8'),
+        "public_key": verify_key.encode().hex(),
         "signature": signature.hex(),
         "payload": payload
     }
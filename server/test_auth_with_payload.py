@@ -3,7 +3,6 @@ import sys
 import os
 import requests
 from nacl.signing import SigningKey
-from nacl.encoding import HexEncoder
 
 def load_payload(payload_file):
     """Load payload from a JSON file."""
@@ -23,15 +22,15 @@ def test_authorization(payload_file):
         print("No private key found in payload. Generating a new keypair...")
         signing_key = SigningKey.generate()
         verify_key = signing_key.verify_key
-        payload['private_key'] = signing_key.encode(encoder=HexEncoder).decode('utf-8')
-        payload['public_key'] = verify_key.encode(encoder=HexEncoder).decode('utf-8')
+        payload['private_key'] = signing_key.encode().hex()
+        payload['public_key'] = verify_key.encode().hex()
         print(f"Generated new keypair. Public key: {payload['public_key']}")
     else:
         # Load the keypair from the payload
         try:
-            signing_key = SigningKey(payload['private_key'], encoder=HexEncoder)
+            signing_key = SigningKey(bytes.fromhex(payload['private_key']))
             verify_key = signing_key.verify_key
-            payload['public_key'] = verify_key.encode(encoder=HexEncoder).decode('utf-8')
+            payload['public_key'] = verify_key.encode().hex()
         except Exception as e:
             print(f"Error loading private key: {e}")
             sys.exit(1)
@@ -6,51 +6,88 @@ This script tests the basic functionality of the server endpoints.
 """
 
 import requests
-import json
-import time
-import sys
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 SERVER_URL = "http://localhost:8000"
+HEALTH_URL = f"{SERVER_URL}/health"
+ROOT_URL = f"{SERVER_URL}/"
+INITIALIZE_URL = f"{SERVER_URL}/initialize"
+STATE_URL = f"{SERVER_URL}/state"
+PROCESS_BLOCK_URL = f"{SERVER_URL}/process-block"
+RESET_URL = f"{SERVER_URL}/reset"
+BATCH_URL = f"{SERVER_URL}/batch"
 
-def test_health():
-    """Test the health endpoint."""
+# One keep-alive session shared by every probe instead of a new connection per call
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+))
+
+@lru_cache(maxsize=1)
+def load_sample_bytes():
+    """Read sample_data.json once; it is posted as-is without a decode/encode round trip."""
+    with open('sample_data.json', 'rb') as f:
+        return f.read()
+
+def report_health(status_code, data):
+    """Print a health response; data is only read on a 200."""
     try:
-        response = requests.get(f"{SERVER_URL}/health")
-        print(f"✅ Health check: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        print(f"✅ Health check: {status_code}")
+        if status_code == 200:
             print(f"   Status: {data['status']}")
             print(f"   Safrole initialized: {data['safrole_initialized']}")
-        return response.status_code == 200
+        return status_code == 200
     except Exception as e:
         print(f"❌ Health check failed: {e}")
         return False
 
-def test_root():
-    """Test the root endpoint."""
+def report_root(status_code, data):
+    """Print a root endpoint response; data is only read on a 200."""
     try:
-        response = requests.get(f"{SERVER_URL}/")
-        print(f"✅ Root endpoint: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        print(f"✅ Root endpoint: {status_code}")
+        if status_code == 200:
             print(f"   Message: {data['message']}")
             print(f"   Version: {data['version']}")
-        return response.status_code == 200
+        return status_code == 200
+    except Exception as e:
+        print(f"❌ Root endpoint failed: {e}")
+        return False
+
+def test_health():
+    """Test the health endpoint."""
+    try:
+        response = SESSION.get(HEALTH_URL)
+    except Exception as e:
+        print(f"❌ Health check failed: {e}")
+        return False
+    return report_health(response.status_code, orjson.loads(response.content) if response.status_code == 200 else None)
+
+def test_root():
+    """Test the root endpoint."""
+    try:
+        response = SESSION.get(ROOT_URL)
     except Exception as e:
         print(f"❌ Root endpoint failed: {e}")
         return False
+    return report_root(response.status_code, orjson.loads(response.content) if response.status_code == 200 else None)
 
 def test_initialize():
     """Test the initialize endpoint."""
     try:
-        # Load sample data
-        with open('sample_data.json', 'r') as f:
-            sample_data = json.load(f)
-        
-        response = requests.post(f"{SERVER_URL}/initialize", json=sample_data)
+        response = SESSION.post(
+            INITIALIZE_URL,
+            data=load_sample_bytes(),
+            headers={"Content-Type": "application/json"}
+        )
         print(f"✅ Initialize endpoint: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"   Success: {data['success']}")
             print(f"   Message: {data['message']}")
             if data['data']:
@@ -63,10 +100,10 @@ def test_initialize():
 def test_state():
     """Test the state endpoint."""
     try:
-        response = requests.get(f"{SERVER_URL}/state")
+        response = SESSION.get(STATE_URL)
         print(f"✅ State endpoint: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"   Success: {data['success']}")
             print(f"   Current slot (tau): {data['data']['tau']}")
         return response.status_code == 200
@@ -83,14 +120,13 @@ def test_process_block():
                 "slot": 2,
                 "entropy": "0x9d3f7e438f2b1c5a6e8d9f0a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0",
                 "extrinsic": []
-            },
-            "pre_state": {}  # Will be ignored since we're already initialized
+            }
         }
         
-        response = requests.post(f"{SERVER_URL}/process-block", json=test_block)
+        response = SESSION.post(PROCESS_BLOCK_URL, json=test_block)
         print(f"✅ Process-block endpoint: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"   Success: {data['success']}")
             print(f"   New slot: {data['data']['current_slot']}")
         return response.status_code == 200
@@ -101,10 +137,10 @@ def test_process_block():
 def test_reset():
     """Test the reset endpoint."""
     try:
-        response = requests.post(f"{SERVER_URL}/reset")
+        response = SESSION.post(RESET_URL)
         print(f"✅ Reset endpoint: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"   Success: {data['success']}")
             print(f"   Message: {data['message']}")
         return response.status_code == 200
@@ -112,24 +148,43 @@ def test_reset():
         print(f"❌ Reset endpoint failed: {e}")
         return False
 
+def probe_server_concurrently():
+    """Run the independent health and root probes concurrently."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        healthy, _ = executor.map(lambda probe: probe(), [test_health, test_root])
+    return healthy
+
+def probe_server():
+    """Fetch health and root in one /batch round trip, falling back to separate probes."""
+    try:
+        response = SESSION.post(BATCH_URL, json=[
+            {"method": "GET", "path": "/health"},
+            {"method": "GET", "path": "/"},
+        ])
+    except Exception as e:
+        print(f"❌ Health check failed: {e}")
+        return False
+    if response.status_code != 200:
+        # Servers without /batch
+        return probe_server_concurrently()
+    health, root = orjson.loads(response.content)
+    healthy = report_health(health["status_code"], health["body"])
+    report_root(root["status_code"], root["body"])
+    return healthy
+
 def main():
     """Run all tests."""
     print("🧪 Testing JAM Safrole Integration Server")
     print("=" * 50)
     
-    # Check if server is running
-    if not test_health():
+    # Check if server is running (the root endpoint is probed alongside)
+    if not probe_server():
         print("\n❌ Server is not running or not accessible")
         print("   Start the server with: python app.py")
         return
     
     print("\n" + "=" * 50)
     
-    # Test root endpoint
-    test_root()
-    
-    print("\n" + "=" * 50)
-    
     # Test initialize
     if test_initialize():
         print("\n" + "=" * 50)
@@ -1,5 +1,4 @@
 import json
-import nacl.encoding
 import nacl.signing
 from nacl.exceptions import BadSignatureError
 
@@ -8,8 +7,8 @@ signing_key = nacl.signing.SigningKey.generate()
 verify_key = signing_key.verify_key
 
 # Convert to hex strings for storage/transmission
-private_key_hex = signing_key.encode(encoder=nacl.encoding.HexEncoder).decode('utf-8')
-public_key_hex = verify_key.encode(encoder=nacl.encoding.HexEncoder).decode('utf-8')
+private_key_hex = signing_key.encode().hex()
+public_key_hex = verify_key.encode().hex()
 
 print(f"Generated key pair:")
 print(f"Private key (keep this secret!): {private_key_hex}")
@@ -33,13 +32,11 @@ signature_bytes = signed_message.signature
 signature_hex = signature_bytes.hex()
 
 print(f"\nSignature: {signature_hex}")
-print(f"Message with signature: {signed_message.hex()}")
 
 # Now verify the signature
 try:
-    # Reconstruct the signed message by combining signature and message
-    reconstructed_signed = signature_bytes + message
-    verify_key.verify(reconstructed_signed)
+    # The signed message already is signature || message
+    verify_key.verify(signed_message)
     print("\nSignature verification SUCCEEDED")
     
     # Prepare the test request
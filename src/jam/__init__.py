@@ -8,8 +8,22 @@ This package provides core functionality for blockchain consensus and mining ope
 __version__ = "1.0.0"
 __author__ = "JAM Protocol Team"
 
-from .core.safrole_manager import SafroleManager
-from .protocols.fallback_condition import calculate_fallback_gamma_s
+import importlib
+
+# Public names and the submodules that define them, imported on first access
+# so that `import jam` does not pull in the whole dependency graph.
+_LAZY = {
+    "SafroleManager": ".core.safrole_manager",
+    "calculate_fallback_gamma_s": ".protocols.fallback_condition",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "SafroleManager",
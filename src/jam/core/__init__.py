@@ -4,6 +4,17 @@ Core JAM Protocol Components
 This module contains the core implementation classes for the JAM protocol.
 """
 
-from .safrole_manager import SafroleManager
+import importlib
+
+# Imported on first access, like the top-level jam package
+_LAZY = {"SafroleManager": ".safrole_manager"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ["SafroleManager"] 
\ No newline at end of file
@@ -7,12 +7,16 @@ the JAM protocol state transitions and block processing.
 
 import json
 import copy
+import logging
+import hashlib
+import heapq
+import operator
 import requests
-import sys
 
 from ..utils.helpers import (
     hex_to_bytes,
     bytes_to_hex,
+    canonical_json,
     deep_clone,
     get_epoch_and_slot_phase,
     process_validator_keys_for_offenders,
@@ -22,6 +26,12 @@ from ..utils.helpers import (
 from ..utils.crypto_bridge import CryptoBridge
 from ..protocols.fallback_condition import calculate_fallback_gamma_s
 
+logger = logging.getLogger(__name__)
+
+# Keep-alive session for the local Rust verifier, shared by all managers
+_verifier_session = requests.Session()
+_verifier_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 class SafroleManager:
     """Main manager class for JAM protocol state transitions."""
@@ -34,6 +44,8 @@ class SafroleManager:
             test_vector_file_path: Optional path to test vector file for test mode
         """
         self.state = deep_clone(initial_state)
+        # Hash of self.state, computed on demand and reset by process_block
+        self._state_root = None
         is_tiny = test_vector_file_path and "/tiny/" in str(test_vector_file_path)
 
         # Set default values only if they don't exist in initial_state
@@ -67,26 +79,37 @@ class SafroleManager:
                 "eta2_prime": eta2_prime,
                 "extrinsic": extrinsic,
             }
-            response = requests.post(
+            response = _verifier_session.post(
                 "http://127.0.0.1:3000/verifier/ring_vrf_verify_payload", json=payload
             )
             response.raise_for_status()
             return response.json()["results"]
         except requests.exceptions.RequestException as e:
-            print(f"Rust server batch verification error: {e}", file=sys.stderr)
+            logger.error("Rust server batch verification error: %s", e)
             raise Exception("rust_server_batch_verify_failed")
 
+    def state_root(self):
+        """BLAKE2b-256 of the canonical JSON of the current state, as 0x-hex.
+
+        The digest is kept until the next process_block, so asking for the
+        root of an unchanged state does not serialize it again.
+        """
+        if self._state_root is None:
+            self._state_root = "0x" + hashlib.blake2b(
+                canonical_json(self.state), digest_size=32
+            ).hexdigest()
+        return self._state_root
+
     def process_block(self, block_input):
         """Process a block and update the state."""
         pre_state = self.state
-        print(f"Prestate state****************************: {pre_state}")
         
         # Initialize tau to -1 if it doesn't exist (for genesis block)
         if "tau" not in pre_state:
             pre_state["tau"] = -1
             
         # Debug output for slot and tau values
-        print(f"Processing block - slot: {block_input['slot']}, current tau: {pre_state['tau']}")
+        logger.debug("Processing block - slot: %s, current tau: %s", block_input["slot"], pre_state["tau"])
         
         if block_input["slot"] <= pre_state["tau"]:
             raise ValueError(f"bad_slot: block slot {block_input['slot']} is not greater than tau {pre_state['tau']}")
@@ -95,7 +118,9 @@ class SafroleManager:
         if is_gap_block and block_input.get("extrinsic"):
             raise ValueError("unexpected_ticket")
 
-        current_state = deep_clone(pre_state)
+        # Top-level copy only: every field the transition changes is assigned a
+        # new object below, so pre_state's nested values are never mutated
+        current_state = dict(pre_state)
         # Update tau to the current block's slot
         current_state["tau"] = block_input["slot"]
 
@@ -176,13 +201,17 @@ class SafroleManager:
                     "randomness": hex_to_bytes(randomness_hex),
                 })
 
-            current_state["gamma_a"].extend(new_tickets)
-            current_state["gamma_a"].sort(key=lambda t: t["randomness"])
-            current_state["gamma_a"] = current_state["gamma_a"][: current_state["E"]]
+            # Only the E lowest-randomness tickets are kept
+            current_state["gamma_a"] = heapq.nsmallest(
+                current_state["E"],
+                current_state["gamma_a"] + new_tickets,
+                key=operator.itemgetter("randomness"),
+            )
 
         if next_epoch > prev_epoch:
-            current_state["lambda_"] = deep_clone(pre_state["kappa"])
-            current_state["kappa"] = deep_clone(pre_state["gamma_k"])
+            # Neither list is mutated in place, so they move down without cloning
+            current_state["lambda_"] = current_state["kappa"]
+            current_state["kappa"] = current_state["gamma_k"]
             current_state["gamma_k"] = process_validator_keys_for_offenders(
                 pre_state["iota"], pre_state["post_offenders"]
             )
@@ -249,4 +278,5 @@ class SafroleManager:
         ]
 
         self.state = current_state
+        self._state_root = None
         return {"header": header, "post_state": post_state_output} 
\ No newline at end of file
@@ -34,21 +34,15 @@ def calculate_fallback_gamma_s(post_state):
     if validator_set_size == 0:
         return []
 
-    new_gamma_s_keys = []
+    # The entropy prefix is absorbed once; each index only hashes its 4 bytes
+    entropy_hash = blake2b(entropy_bytes, digest_size=32)
+    keys = [validator['bandersnatch'] for validator in new_validator_set]
 
+    new_gamma_s_keys = []
     for i in range(E):
-        index_bytes = i.to_bytes(4, 'little')
-        
-        concatenated_input = entropy_bytes + index_bytes
-        
-        hash_result = blake2b(concatenated_input, digest_size=32).digest()
-        
-        random_index_bytes = hash_result[:4]
-        random_index = le_bytes_to_int(random_index_bytes)
-        
-        validator_index = random_index % validator_set_size
-        selected_validator = new_validator_set[validator_index]
-        
-        new_gamma_s_keys.append(selected_validator['bandersnatch'])
-        
-    return new_gamma_s_keys 
\ No newline at end of file
+        h = entropy_hash.copy()
+        h.update(i.to_bytes(4, 'little'))
+        random_index = le_bytes_to_int(h.digest()[:4])
+        new_gamma_s_keys.append(keys[random_index % validator_set_size])
+
+    return new_gamma_s_keys
@@ -14,6 +14,8 @@ from .helpers import (
     process_validator_keys_for_offenders,
     z,
     get_gamma_z_from_rust_server,
+    get_gamma_z_batch,
+    write_file_atomic,
 )
 
 __all__ = [
@@ -26,4 +28,6 @@ __all__ = [
     "process_validator_keys_for_offenders",
     "z",
     "get_gamma_z_from_rust_server",
+    "get_gamma_z_batch",
+    "write_file_atomic",
 ] 
\ No newline at end of file
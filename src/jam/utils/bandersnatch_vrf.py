@@ -6,10 +6,16 @@ for proper VRF signature generation according to Graypaper specifications.
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import hashlib
+import functools
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
-from .helpers import bytes_to_hex, hex_to_bytes
+from .helpers import bytes_to_hex, hex_to_bytes, warm_up_session
 
 
 class BandersnatchVRFClient:
@@ -22,6 +28,15 @@ class BandersnatchVRFClient:
     - Verify VRF signatures
     """
     
+    # One keep-alive session per server URL, shared by every client for it
+    _SESSIONS: Dict[str, requests.Session] = {}
+    # Seconds an availability probe result is reused
+    AVAILABILITY_TTL = 5.0
+    # Consecutive connection failures after which the server is skipped...
+    FAILURE_THRESHOLD = 3
+    # ...for this many seconds
+    BREAKER_OPEN_SECONDS = 30.0
+    
     def __init__(self, api_url: str = "http://localhost:3000"):
         """
         Initialize the VRF client.
@@ -30,21 +45,75 @@ class BandersnatchVRFClient:
             api_url: URL of the Bandersnatch VRF API server
         """
         self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        self.session = BandersnatchVRFClient._SESSIONS.get(self.api_url)
+        if self.session is None:
+            self.session = BandersnatchVRFClient._SESSIONS.setdefault(
+                self.api_url, self._build_session()
+            )
+        # (time.monotonic() of the last probe or request, server reachable)
+        self._availability: Optional[Tuple[float, bool]] = None
+        self._failures = 0
+        self._open_until = 0.0
+        # Cleared once the server answers 404 for /prover/safrole_pair
+        self._pair_supported = True
+    
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Pooled JSON session with a couple of quick retries on connection errors."""
+        session = requests.Session()
+        session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.1),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _record_success(self):
+        """Reset the consecutive-failure count after a successful exchange."""
+        self._failures = 0
+        self._availability = (time.monotonic(), True)
+    
+    def _record_failure(self):
+        now = time.monotonic()
+        self._failures += 1
+        self._availability = (now, False)
+        if self._failures >= self.FAILURE_THRESHOLD:
+            self._open_until = now + self.BREAKER_OPEN_SECONDS
+    
+    def _note_request_error(self, error: Exception):
+        """Count a failed connection towards opening the circuit breaker."""
+        if isinstance(error, requests.exceptions.RequestException):
+            self._record_failure()
     
     def is_server_available(self) -> bool:
         """
         Check if the Bandersnatch VRF API server is available.
         
+        A probe result is reused for AVAILABILITY_TTL seconds, and after
+        FAILURE_THRESHOLD consecutive failures the server is reported down
+        for BREAKER_OPEN_SECONDS without being contacted.
+        
         Returns:
             True if server is available, False otherwise
         """
+        now = time.monotonic()
+        if now < self._open_until:
+            return False
+        if self._availability is not None and now - self._availability[0] < self.AVAILABILITY_TTL:
+            return self._availability[1]
         try:
             response = self.session.get(f"{self.api_url}/", timeout=2)
-            return response.status_code == 200
         except Exception:
+            self._record_failure()
+            return False
+        if response.status_code != 200:
+            self._record_failure()
             return False
+        self._record_success()
+        return True
     
     def create_prover(self, public_keys: List[str], prover_index: int) -> Optional[Dict[str, Any]]:
         """
@@ -65,17 +134,19 @@ class BandersnatchVRFClient:
             
             response = self.session.post(
                 f"{self.api_url}/prover/create",
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=10
             )
             
             if response.status_code == 200:
+                self._record_success()
                 return response.json()
             else:
                 print(f"Failed to create prover: {response.status_code} - {response.text}")
                 return None
                 
         except Exception as e:
+            self._note_request_error(e)
             print(f"Error creating prover: {e}")
             return None
     
@@ -98,11 +169,12 @@ class BandersnatchVRFClient:
             
             response = self.session.post(
                 f"{self.api_url}/prover/vrf_output",
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=10
             )
             
             if response.status_code == 200:
+                self._record_success()
                 result = response.json()
                 return result.get("vrf_output_hash")
             else:
@@ -110,6 +182,7 @@ class BandersnatchVRFClient:
                 return None
                 
         except Exception as e:
+            self._note_request_error(e)
             print(f"Error generating VRF output: {e}")
             return None
     
@@ -134,11 +207,12 @@ class BandersnatchVRFClient:
             
             response = self.session.post(
                 f"{self.api_url}/prover/ietf_vrf_sign",
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=10
             )
             
             if response.status_code == 200:
+                self._record_success()
                 result = response.json()
                 return result.get("signature")
             else:
@@ -146,9 +220,56 @@ class BandersnatchVRFClient:
                 return None
                 
         except Exception as e:
+            self._note_request_error(e)
             print(f"Error generating IETF VRF signature: {e}")
             return None
     
+    def generate_safrole_pair(self, prover_id: str, header_hex: str, aux_data: str = "") -> Optional[Tuple[str, str]]:
+        """
+        Generate the Safrole seal signature (HS) and VRF output (HV) in one request.
+        
+        Args:
+            prover_id: ID of the prover instance
+            header_hex: Serialized header as hex string
+            aux_data: Additional data as hex string
+            
+        Returns:
+            Tuple of (HS, HV) as hex strings, or None if the server does not
+            provide /prover/safrole_pair or the request failed
+        """
+        if not self._pair_supported:
+            return None
+        try:
+            payload = {
+                "prover_id": prover_id,
+                "vrf_input_data": header_hex,
+                "aux_data": aux_data
+            }
+            
+            response = self.session.post(
+                f"{self.api_url}/prover/safrole_pair",
+                data=orjson.dumps(payload),
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                self._record_success()
+                result = response.json()
+                hs, hv = (result.get("hs"), result.get("hv")) if isinstance(result, dict) else (None, None)
+                if isinstance(hs, str) and isinstance(hv, str):
+                    return hs, hv
+                print(f"Malformed Safrole VRF pair response: {result}")
+                return None
+            if response.status_code == 404:
+                # Older servers; callers go straight to the two-call path from now on
+                self._pair_supported = False
+            return None
+                
+        except Exception as e:
+            self._note_request_error(e)
+            print(f"Error generating Safrole VRF pair: {e}")
+            return None
+    
     def generate_ring_vrf_signature(self, prover_id: str, vrf_input_data: str, aux_data: str = "") -> Optional[str]:
         """
         Generate Ring VRF signature using the VRF server.
@@ -170,11 +291,12 @@ class BandersnatchVRFClient:
             
             response = self.session.post(
                 f"{self.api_url}/prover/ring_vrf_sign",
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=10
             )
             
             if response.status_code == 200:
+                self._record_success()
                 result = response.json()
                 return result.get("signature")
             else:
@@ -182,6 +304,7 @@ class BandersnatchVRFClient:
                 return None
                 
         except Exception as e:
+            self._note_request_error(e)
             print(f"Error generating Ring VRF signature: {e}")
             return None
 
@@ -196,6 +319,9 @@ class SafroleVRFHelper:
     - Integrating with the Bandersnatch VRF server
     """
     
+    # Provers kept per helper before the least recently used is dropped
+    MAX_CACHED_PROVERS = 64
+    
     def __init__(self, vrf_client: Optional[BandersnatchVRFClient] = None):
         """
         Initialize the Safrole VRF helper.
@@ -204,7 +330,12 @@ class SafroleVRFHelper:
             vrf_client: Bandersnatch VRF client (optional)
         """
         self.vrf_client = vrf_client or BandersnatchVRFClient()
-        self.prover_cache: Dict[str, str] = {}  # Cache prover IDs
+        # Prover IDs by (validator index, ring), least recently used first
+        self.prover_cache: "OrderedDict[Tuple[int, Tuple[str, ...]], str]" = OrderedDict()
+        # Guards prover_cache and _per_key_locks; the per-key locks make
+        # concurrent misses on one ring wait for a single create_prover call
+        self._cache_lock = threading.Lock()
+        self._per_key_locks: Dict[Tuple[int, Tuple[str, ...]], threading.Lock] = {}
     
     def generate_safrole_vrf_signatures(
         self, 
@@ -237,8 +368,14 @@ class SafroleVRFHelper:
                 print("⚠️  Failed to create VRF prover, using simplified VRF")
                 return self._generate_simplified_vrf(header_data, entropy_context)
             
-            # Generate HS (seal signature) - GP equation 6.15/6.16
+            # HS and HV together in one round trip; servers without the
+            # combined endpoint fall through to the two separate calls below
             header_hex = bytes_to_hex(header_data)
+            pair = self.vrf_client.generate_safrole_pair(prover_id, header_hex, "")
+            if pair:
+                return pair
+            
+            # Generate HS (seal signature) - GP equation 6.15/6.16
             hs_signature = self.vrf_client.generate_ietf_vrf_signature(
                 prover_id=prover_id,
                 vrf_input_data=header_hex,
@@ -281,21 +418,46 @@ class SafroleVRFHelper:
         Returns:
             Prover ID or None if failed
         """
-        # Create cache key
-        cache_key = f"{len(validator_keys)}_{validator_index}_{hash(tuple(validator_keys))}"
+        # Keyed by the ring itself: str hashes are cached, so this is cheap,
+        # and unlike a hash() of the ring two rings can never share a prover
+        cache_key = (validator_index, tuple(validator_keys))
         
         # Check cache
-        if cache_key in self.prover_cache:
-            return self.prover_cache[cache_key]
-        
-        # Create new prover
-        result = self.vrf_client.create_prover(validator_keys, validator_index)
-        if result and result.get("prover_id"):
-            prover_id = result["prover_id"]
-            self.prover_cache[cache_key] = prover_id
+        prover_id = self._cached_prover(cache_key)
+        if prover_id is not None:
             return prover_id
         
-        return None
+        with self._cache_lock:
+            key_lock = self._per_key_locks.setdefault(cache_key, threading.Lock())
+        
+        with key_lock:
+            # Another caller may have created it while we waited
+            prover_id = self._cached_prover(cache_key)
+            if prover_id is not None:
+                return prover_id
+            
+            try:
+                # Create new prover
+                result = self.vrf_client.create_prover(validator_keys, validator_index)
+                if result and result.get("prover_id"):
+                    prover_id = result["prover_id"]
+                    with self._cache_lock:
+                        self.prover_cache[cache_key] = prover_id
+                        if len(self.prover_cache) > self.MAX_CACHED_PROVERS:
+                            self.prover_cache.popitem(last=False)
+                    return prover_id
+                return None
+            finally:
+                with self._cache_lock:
+                    self._per_key_locks.pop(cache_key, None)
+    
+    def _cached_prover(self, cache_key: Tuple[int, Tuple[str, ...]]) -> Optional[str]:
+        """Cached prover ID for cache_key, marked most recently used."""
+        with self._cache_lock:
+            prover_id = self.prover_cache.get(cache_key)
+            if prover_id is not None:
+                self.prover_cache.move_to_end(cache_key)
+            return prover_id
     
     def _generate_simplified_vrf(self, header_data: bytes, entropy_context: bytes) -> Tuple[str, str]:
         """
@@ -308,14 +470,34 @@ class SafroleVRFHelper:
         Returns:
             Tuple of (HS, HV) as hex strings
         """
-        # Generate deterministic HS (seal signature)
-        hs_signature = hashlib.blake2b(header_data + b"seal", digest_size=64).digest()
-        
-        # Generate deterministic HV (VRF output)
-        vrf_input = b"jam_entropy" + hs_signature[:32] + entropy_context
-        hv_output = hashlib.blake2b(vrf_input + b"vrf_output", digest_size=32).digest()
-        
-        return bytes_to_hex(hs_signature), bytes_to_hex(hv_output)
+        # bytes() is a no-op for bytes and makes bytearray input hashable
+        return _simplified_vrf(bytes(header_data), bytes(entropy_context))
+
+
+@functools.lru_cache(maxsize=1024)
+def _simplified_vrf(header_data: bytes, entropy_context: bytes) -> Tuple[str, str]:
+    """Fallback (HS, HV) for a header; replays and retries reuse earlier results."""
+    # Generate deterministic HS (seal signature)
+    h = hashlib.blake2b(header_data, digest_size=64)
+    h.update(b"seal")
+    hs_signature = h.digest()
+    
+    # Generate deterministic HV (VRF output)
+    h = hashlib.blake2b(b"jam_entropy", digest_size=32)
+    h.update(hs_signature[:32])
+    h.update(entropy_context)
+    h.update(b"vrf_output")
+    
+    return bytes_to_hex(hs_signature), "0x" + h.hexdigest()
+
+
+# Connect to the default server ahead of the first prover call (JAM_WARMUP=1)
+warm_up_session(
+    BandersnatchVRFClient._SESSIONS.setdefault(
+        "http://localhost:3000", BandersnatchVRFClient._build_session()
+    ),
+    "http://localhost:3000/",
+)
 
 
 # Global VRF helper instance
@@ -11,5 +11,6 @@ class CryptoBridge:
     @staticmethod
     def calculate_eta_update(eta0, vrf_output):
         """Calculate eta update using Blake2b hash."""
-        combined_input = eta0 + vrf_output
-        return blake2b(combined_input, digest_size=32).digest() 
\ No newline at end of file
+        h = blake2b(eta0, digest_size=32)
+        h.update(vrf_output)
+        return h.digest() 
\ No newline at end of file
@@ -4,10 +4,43 @@ Helper utility functions for JAM protocol implementation.
 
 import json
 import copy
+import functools
+import itertools
+import orjson
+import os
+import pickle
 import requests
 import sys
+import threading
 
 
+# Keep-alive session for the local Rust server's gamma_z composition
+_gamma_z_session = requests.Session()
+_gamma_z_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+
+def warm_up_session(session, url):
+    """Open a pooled connection to url in the background when JAM_WARMUP=1.
+
+    Off by default so importing the package has no network side effects.
+    """
+    if os.getenv("JAM_WARMUP") != "1":
+        return
+
+    def _probe():
+        try:
+            session.head(url, timeout=1)
+        except requests.RequestException:
+            pass
+
+    threading.Thread(target=_probe, name="jam-warmup", daemon=True).start()
+
+
+warm_up_session(_gamma_z_session, "http://127.0.0.1:3000/")
+
+# Bandersnatch key the Rust server expects to receive as all zeroes
+_ZERO_BANDERSNATCH = "0x1ecc3686b60ee3b84b6c7d321d70d5c06e9dac63a4d0a79d731b17c0d04d030d"
+
 PADDING_VALIDATOR = {
     "bandersnatch": "0x" + "0" * 64,
     "ed25519": "0x" + "0" * 64,
@@ -31,13 +64,70 @@ def bytes_to_hex(b):
 
 
 def deep_clone(obj):
-    """Create a deep copy of an object."""
-    return copy.deepcopy(obj)
+    """Create a deep copy of an object.
+
+    A pickle round trip copies JSON-like state several times faster than
+    copy.deepcopy; objects pickle cannot handle still go through deepcopy.
+    """
+    try:
+        return pickle.loads(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return copy.deepcopy(obj)
+
+
+def write_file_atomic(path, data):
+    """Write data next to path and rename it over path, so readers never see a partial file."""
+    tmp_path = str(path) + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def canonical_json(obj):
+    """Sorted-key compact JSON, used as hash input for headers, blocks and state."""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which orjson does not encode
+        return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _json_keys(d):
+    """d with keys as JSON would write them (1 -> "1", True -> "true")."""
+    if all(isinstance(k, str) for k in d):
+        return d
+    return {k if isinstance(k, str) else json.dumps(k): v for k, v in d.items()}
 
 
 def deep_equal(a, b):
-    """Compare two objects for deep equality."""
-    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+    """Compare two objects for deep equality.
+
+    Compares structurally and stops at the first difference, with the same
+    result as comparing the two serialized to JSON: lists and tuples compare
+    alike, non-string keys match their string form, and bools and floats
+    never equal ints.
+    """
+    if isinstance(a, dict):
+        if not isinstance(b, dict) or len(a) != len(b):
+            return False
+        a, b = _json_keys(a), _json_keys(b)
+        for key, value in a.items():
+            if key not in b or not deep_equal(value, b[key]):
+                return False
+        return True
+    if isinstance(a, (list, tuple)):
+        if not isinstance(b, (list, tuple)) or len(a) != len(b):
+            return False
+        return all(deep_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, (bool, float)) or isinstance(b, (bool, float)):
+        # JSON keeps true and 1, and 1.0 and 1, apart even though Python does not
+        return type(a) is type(b) and a == b
+    return a == b
 
 
 def get_epoch_and_slot_phase(timeslot, epoch_length):
@@ -46,47 +136,88 @@ def get_epoch_and_slot_phase(timeslot, epoch_length):
 
 
 def process_validator_keys_for_offenders(keys, offenders):
-    """Process validator keys, replacing offenders with padding validators."""
+    """Process validator keys, replacing offenders with padding validators.
+
+    Validator entries are flat dicts of hex strings, so a shallow copy of
+    each keeps the result independent of ``keys``.
+    """
     offender_set = set(offenders)
     return [
-        deep_clone(PADDING_VALIDATOR) if k["ed25519"] in offender_set else deep_clone(k)
+        PADDING_VALIDATOR.copy() if k["ed25519"] in offender_set else k.copy()
         for k in keys
     ]
 
 
 def z(sequence):
-    """Zigzag function for processing sequences."""
-    result = []
-    left, right = 0, len(sequence) - 1
-    while left <= right:
-        if left <= right:
-            result.append(sequence[left])
-        if left < right:
-            result.append(sequence[right])
-        left += 1
-        right -= 1
+    """Zigzag function for processing sequences.
+
+    Interleaves the sequence from both ends: first, last, second, second to
+    last, ..., ending with the middle element when the length is odd.
+    """
+    half = len(sequence) // 2
+    result = list(itertools.chain.from_iterable(zip(sequence[:half], reversed(sequence[half:]))))
+    if len(sequence) % 2:
+        result.append(sequence[half])
     return result
 
 
+@functools.lru_cache(maxsize=256)
+def _fetch_gamma_z(bandersnatch_keys):
+    """gamma_z for a ring of bandersnatch keys; a ring seen before is not re-sent.
+
+    Failed requests raise and so are not cached.
+    """
+    response = _gamma_z_session.post(
+        "http://127.0.0.1:3000/compose_gamma_z",
+        json={"public_keys": list(bandersnatch_keys)},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()["gamma_z"]
+
+
+def _ring_bandersnatch_keys(public_keys, offenders):
+    """Bandersnatch keys of a ring as sent to the Rust server, offenders padded out.
+
+    Same keys as process_validator_keys_for_offenders would give, without
+    building the intermediate validator dicts.
+    """
+    offender_set = set(offenders)
+    padding_key = PADDING_VALIDATOR["bandersnatch"]
+    return [
+        padding_key
+        if k["ed25519"] in offender_set or k["bandersnatch"] == _ZERO_BANDERSNATCH
+        else k["bandersnatch"]
+        for k in public_keys
+    ]
+
+
 def get_gamma_z_from_rust_server(public_keys, offenders):
     """Get gamma_z from Rust server."""
-    processed_keys = process_validator_keys_for_offenders(public_keys, offenders)
-    bandersnatch_keys = [
-        (
-            "0x" + "0" * 64
-            if k["bandersnatch"]
-            == "0x1ecc3686b60ee3b84b6c7d321d70d5c06e9dac63a4d0a79d731b17c0d04d030d"
-            else k["bandersnatch"]
-        )
-        for k in processed_keys
+    bandersnatch_keys = _ring_bandersnatch_keys(public_keys, offenders)
+    try:
+        return _fetch_gamma_z(tuple(bandersnatch_keys))
+    except requests.exceptions.RequestException as e:
+        print(f"Could not reach Rust server to compose gamma_z: {e}", file=sys.stderr)
+        raise Exception("Failed to get gamma_z")
+
+
+def get_gamma_z_batch(rings, offenders):
+    """Get gamma_z for several rings of validator keys in one Rust server request.
+
+    Returns the gamma_z values in the order of ``rings``.
+    """
+    batches = [
+        {"public_keys": _ring_bandersnatch_keys(ring, offenders)} for ring in rings
     ]
     try:
-        response = requests.post(
-            "http://127.0.0.1:3000/compose_gamma_z",
-            json={"public_keys": bandersnatch_keys},
+        response = _gamma_z_session.post(
+            "http://127.0.0.1:3000/compose_gamma_z_batch",
+            json={"batches": batches},
+            timeout=10,
         )
         response.raise_for_status()
         return response.json()["gamma_z"]
     except requests.exceptions.RequestException as e:
-        print(f"Could not reach Rust server to compose gamma_z: {e}", file=sys.stderr)
-        raise Exception("Failed to get gamma_z") 
\ No newline at end of file
+        print(f"Could not reach Rust server to compose gamma_z batch: {e}", file=sys.stderr)
+        raise Exception("Failed to get gamma_z")
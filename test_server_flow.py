@@ -13,6 +13,8 @@ import os
 import json
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Add project paths
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -27,8 +29,18 @@ def test_server_flow():
     # Check if server is running
     server_url = "http://localhost:8000"
     
+    # One keep-alive session for the probe and the report POST. Connect
+    # failures are retried for both, which is safe since nothing reached the
+    # server; Retry's default allowed_methods keeps the non-idempotent POST
+    # out of read and 502/503/504 retries.
+    session = requests.Session()
+    session.mount(
+        "http://",
+        HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])),
+    )
+    
     try:
-        response = requests.get(f"{server_url}/", timeout=2)
+        response = session.get(f"{server_url}/", timeout=2)
         print("✅ Server is running")
     except requests.exceptions.ConnectionError:
         print("❌ Server is not running. Please start with:")
@@ -59,7 +71,7 @@ def test_server_flow():
     
     try:
         # Trigger the server flow
-        response = requests.post(
+        response = session.post(
             f"{server_url}/run-jam-reports",
             json=test_payload,
             timeout=30
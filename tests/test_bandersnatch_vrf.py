@@ -0,0 +1,52 @@
+import os
+import sys
+
+import requests
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from jam.utils.bandersnatch_vrf import BandersnatchVRFClient
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {"vrf_output_hash": "0x" + "ab" * 32}
+
+
+class FakeSession:
+    """Plays back a script of responses; True is a 200, False a connection error."""
+
+    def __init__(self, script):
+        self.script = list(script)
+
+    def post(self, *args, **kwargs):
+        if self.script.pop(0):
+            return FakeResponse()
+        raise requests.exceptions.ConnectionError("connection refused")
+
+
+def make_client(script):
+    client = BandersnatchVRFClient("http://vrf.test")
+    client.session = FakeSession(script)
+    return client
+
+
+def test_breaker_opens_after_consecutive_failures():
+    client = make_client([False] * BandersnatchVRFClient.FAILURE_THRESHOLD)
+    for _ in range(BandersnatchVRFClient.FAILURE_THRESHOLD):
+        assert client.generate_vrf_output("p", "0x00") is None
+    assert client._open_until > 0
+    assert client.is_server_available() is False
+
+
+def test_success_between_failures_keeps_breaker_closed():
+    threshold = BandersnatchVRFClient.FAILURE_THRESHOLD
+    script = [False] * (threshold - 1) + [True] + [False] * (threshold - 1)
+    client = make_client(script)
+    for _ in script:
+        client.generate_vrf_output("p", "0x00")
+    assert client._failures == threshold - 1
+    assert client._open_until == 0.0
@@ -4,19 +4,31 @@ Test runner for JAM protocol test vectors.
 This module contains the logic for running test vectors against the JAM protocol implementation.
 """
 
-import json
+import contextlib
+import io
+import orjson
 import os
 import sys
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
 
 from src.jam.core.safrole_manager import SafroleManager
 from src.jam.utils.helpers import deep_clone, deep_equal
 
 
+_INTERNAL_KEYS = frozenset(("E", "Y", "e", "m", "N"))
+
+
 def strip_internal_keys(state: Dict[str, Any]) -> Dict[str, Any]:
-    """Remove internal keys from state for comparison."""
-    internal_keys = ["E", "Y", "e", "m", "N"]
-    return {k: v for k, v in state.items() if k not in internal_keys}
+    """Remove internal keys from state for comparison (returns state as-is if none are present)."""
+    if _INTERNAL_KEYS.isdisjoint(state):
+        return state
+    return {k: v for k, v in state.items() if k not in _INTERNAL_KEYS}
+
+
+def pretty_json(obj: Any) -> str:
+    """Indented JSON for mismatch reports."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
 
 
 def initialize_set(s):
@@ -44,8 +56,8 @@ def run_test_vector(test_vector_file: str, index: int, total: int, is_full: bool
     )
 
     try:
-        with open(test_vector_path, "r") as f:
-            test_vector = json.load(f)
+        with open(test_vector_path, "rb") as f:
+            test_vector = orjson.loads(f.read())
 
         for key in ["lambda", "kappa", "gamma_k", "iota", "gamma_a", "post_offenders"]:
             test_vector["pre_state"][key] = initialize_set(
@@ -89,12 +101,12 @@ def run_test_vector(test_vector_file: str, index: int, total: int, is_full: bool
             print(f"❌ FAILED! Test vector {index + 1}: {test_vector_file}")
             if not output_matches:
                 print(f"--- Output Mismatch in {test_vector_file} ---")
-                print("Expected:", json.dumps(expected_output, indent=2))
-                print("Actual:", json.dumps(result_output, indent=2))
+                print("Expected:", pretty_json(expected_output))
+                print("Actual:", pretty_json(result_output))
             if not post_state_matches:
                 print(f"--- Post-State Mismatch in {test_vector_file} ---")
-                print("Expected:", json.dumps(expected_post_state, indent=2))
-                print("Actual:", json.dumps(post_state, indent=2))
+                print("Expected:", pretty_json(expected_post_state))
+                print("Actual:", pretty_json(post_state))
             return False
 
     except Exception as e:
@@ -102,8 +114,19 @@ def run_test_vector(test_vector_file: str, index: int, total: int, is_full: bool
         return False
 
 
-def run_all_tests(test_files: List[str], is_full: bool = False, fail_fast: bool = False) -> bool:
-    """Run all test vectors."""
+def run_all_tests(
+    test_files: List[str],
+    is_full: bool = False,
+    fail_fast: bool = False,
+    sequential: bool = False,
+) -> bool:
+    """Run all test vectors, in worker processes unless sequential is set."""
+    if sequential:
+        return _report(_run_sequential(test_files, is_full, fail_fast))
+    return _report(_run_parallel(test_files, is_full, fail_fast))
+
+
+def _run_sequential(test_files: List[str], is_full: bool, fail_fast: bool) -> bool:
     all_passed = True
     for idx, test_file in enumerate(test_files):
         try:
@@ -119,7 +142,45 @@ def run_all_tests(test_files: List[str], is_full: bool = False, fail_fast: bool
             if fail_fast:
                 print(f"Fail-fast: stopping at {test_file}")
                 break
-    
+    return all_passed
+
+
+def _run_vector_captured(test_file: str, index: int, total: int, is_full: bool) -> Tuple[bool, str]:
+    """Worker side of _run_parallel: run a vector and return its report instead of printing it."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = run_test_vector(test_file, index, total, is_full=is_full)
+    return result, out.getvalue()
+
+
+def _run_parallel(test_files: List[str], is_full: bool, fail_fast: bool) -> bool:
+    all_passed = True
+    total = len(test_files)
+    with ProcessPoolExecutor() as ex:
+        futures = [
+            ex.submit(_run_vector_captured, test_file, idx, total, is_full)
+            for idx, test_file in enumerate(test_files)
+        ]
+        # Reports are printed in submission order so they read as in a
+        # sequential run, and fail_fast stops at the same vector
+        for idx, (test_file, future) in enumerate(zip(test_files, futures)):
+            try:
+                result, report = future.result()
+                print(report, end="")
+            except Exception as e:
+                print(f"Error running {test_file}: {e}")
+                result = False
+            if not result:
+                all_passed = False
+                if fail_fast:
+                    print(f"Fail-fast: stopping at {test_file}")
+                    for pending in futures[idx + 1:]:
+                        pending.cancel()
+                    break
+    return all_passed
+
+
+def _report(all_passed: bool) -> bool:
     if all_passed:
         print("\nAll test vectors passed! ✅")
     else:
@@ -1,74 +1,166 @@
+import hashlib
 import json
 import os
+import shutil
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # plain json still works, just slower
+    orjson = None
+
+# State files are a few hundred KiB; read them in one go
+_IO_BUFFER_SIZE = 1 << 20
+
+# Account written by update_accounts_in_state
+_NEW_ACCOUNT = {
+    "id": 42,
+    "data": {
+        "service": {
+            "code_hash": "0x6470fd21983eae8d706f1edd5e2dc5afe095980f8fb7bd4ebfd33550d8730246",
+            "balance": 20219,
+            "min_item_gas": 10,
+            "min_memo_gas": 10,
+            "bytes": 19999,
+            "deposit_offset": 0,
+            "items": 2,
+            "creation_slot": 0,
+            "last_accumulation_slot": 0,
+            "parent_service": 0
+        }
+    }
+}
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(state):
+    """Indented JSON bytes for the state file."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(state, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which orjson does not encode
+            pass
+    return json.dumps(state, indent=2).encode('utf-8')
+
+
+def _content_digest(state):
+    """Digest of the state's content, independent of how the file was formatted.
+
+    Hashes sorted-key compact JSON, as canonical_json does, so an indented
+    file and the server's compact one agree when their content does.
+    """
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.dumps(state, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which orjson does not encode
+            pass
+    if data is None:
+        data = json.dumps(state, sort_keys=True, separators=(",", ":")).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+def _load_state(path):
+    """(state, digest of its content) for the state file at path."""
+    with open(path, 'rb', buffering=_IO_BUFFER_SIZE) as f:
+        state = _loads(f.read())
+    return state, _content_digest(state)
+
+
+def _write_state(state_file, state, on_disk_digest=None):
+    """Write state to state_file atomically, backing up the original once.
+
+    Skipped when the state's content matches on_disk_digest, the digest of
+    the content as it was loaded. Returns whether the file was written.
+    """
+    if _content_digest(state) == on_disk_digest:
+        return False
+    payload = _dumps(state)
+    
+    backup_file = state_file.with_suffix(".json.bak")
+    
+    # Create a backup of the original file: a second link to its inode,
+    # which keeps the old bytes once the new state is renamed over it
+    try:
+        os.link(state_file, backup_file)
+    except FileExistsError:
+        pass
+    except OSError:
+        # e.g. filesystems without hard links
+        if not backup_file.exists():
+            shutil.copyfile(state_file, backup_file)
+    
+    # Write the updated state to a sibling file and rename it into place,
+    # so readers never see a half-written state
+    tmp_file = state_file.with_name(state_file.name + ".tmp")
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_file, state_file)
+    return True
+
+
+@contextmanager
+def open_state(path):
+    """Load the state at path once, and write it back once on a clean exit.
+
+    Lets several updates share one read and one write:
+
+        with open_state(path) as state:
+            apply_account_update(state, a)
+            apply_account_update(state, b)
+
+    Nothing is written if the block raises, or if the content is unchanged
+    (whatever formatting the file on disk uses).
+    """
+    state_file = Path(path)
+    # A missing file surfaces as FileNotFoundError from open()
+    state, on_disk_digest = _load_state(state_file)
+    yield state
+    _write_state(state_file, state, on_disk_digest)
+
+
+def apply_account_update(state, account):
+    """Replace the account with the same ID in state, or append it."""
+    accounts = state.setdefault("accounts", [])
+    
+    # Index accounts by ID; setdefault keeps the first one, as the old scan did
+    idx_by_id = {}
+    for i, existing in enumerate(accounts):
+        idx_by_id.setdefault(existing.get("id"), i)
+    
+    i = idx_by_id.get(account["id"])
+    if i is None:
+        # If account doesn't exist, add it
+        accounts.append(account)
+    else:
+        # Update existing account
+        accounts[i] = account
+
+
 def update_accounts_in_state():
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    state_file = os.path.join(BASE_DIR, "..", "server", "updated_state.json")
-    state_file = os.path.normpath(state_file)
     # Path to the updated_state.json file
     # state_file = Path("/Users/anish/Desktop/fulljam/Jam_implementation_full/server/updated_state.json")
-    
-    # Check if the file exists
-    if not state_file.exists():
-        print(f"Error: {state_file} does not exist.")
-        return False
+    state_file = Path(BASE_DIR, "..", "server", "updated_state.json").resolve()
     
     try:
-        # Read the current state
-        with open(state_file, 'r') as f:
-            state = json.load(f)
-        
-        # Define the new account information
-        new_account = {
-            "id": 42,
-            "data": {
-                "service": {
-                    "code_hash": "0x6470fd21983eae8d706f1edd5e2dc5afe095980f8fb7bd4ebfd33550d8730246",
-                    "balance": 20219,
-                    "min_item_gas": 10,
-                    "min_memo_gas": 10,
-                    "bytes": 19999,
-                    "deposit_offset": 0,
-                    "items": 2,
-                    "creation_slot": 0,
-                    "last_accumulation_slot": 0,
-                    "parent_service": 0
-                }
-            }
-        }
-        
-        # Update the accounts array in the state
-        if "accounts" not in state:
-            state["accounts"] = []
-        
-        # Check if account with ID 42 already exists
-        account_exists = False
-        for i, account in enumerate(state["accounts"]):
-            if account.get("id") == 42:
-                # Update existing account
-                state["accounts"][i] = new_account
-                account_exists = True
-                break
-        
-        # If account doesn't exist, add it
-        if not account_exists:
-            state["accounts"].append(new_account)
-        
-        # Create a backup of the original file
-        backup_file = state_file.with_suffix(".json.bak")
-        if not backup_file.exists():
-            with open(backup_file, 'w') as f:
-                json.dump(state, f, indent=2)
-        
-        # Write the updated state back to the file
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        with open_state(state_file) as state:
+            # Shared, not copied: nothing mutates it, and every load parses
+            # a fresh state
+            apply_account_update(state, _NEW_ACCOUNT)
         
         print(f"Successfully updated {state_file}")
         return True
         
+    except FileNotFoundError:
+        print(f"Error: {state_file} does not exist.")
+        return False
     except Exception as e:
         print(f"Error updating state: {e}")
         return False